@@ -4,17 +4,58 @@ Works without whisper/gtts installed
 """
 
 import io
+import re
 import base64
-from typing import Optional, Tuple
+import asyncio
+import shutil
+import tempfile
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple, AsyncIterator, Union
 from pathlib import Path
 
 # Try to import audio libraries (optional)
+try:
+    from faster_whisper import WhisperModel
+    FASTER_WHISPER_AVAILABLE = True
+except ImportError:
+    FASTER_WHISPER_AVAILABLE = False
+
+try:
+    from pywhispercpp.model import Model as WhisperCppModel
+    WHISPER_CPP_AVAILABLE = True
+except ImportError:
+    WHISPER_CPP_AVAILABLE = False
+
 try:
     import whisper
     WHISPER_AVAILABLE = True
 except ImportError:
     WHISPER_AVAILABLE = False
 
+try:
+    import onnxruntime as ort
+    from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+    from transformers import WhisperProcessor
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+# Speech-to-text backends in order of preference
+STT_BACKENDS = {
+    "faster_whisper": FASTER_WHISPER_AVAILABLE,
+    "whisper_cpp": WHISPER_CPP_AVAILABLE,
+    "openai": WHISPER_AVAILABLE,
+    "onnx": ONNX_AVAILABLE
+}
+
+try:
+    import numpy as np
+    import soundfile as sf
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    SOUNDFILE_AVAILABLE = False
+
 try:
     from gtts import gTTS
     GTTS_AVAILABLE = True
@@ -24,6 +65,14 @@ except ImportError:
 from config import config
 from logger import logger
 
+# Whisper models expect 16 kHz mono float32 input
+WHISPER_SAMPLE_RATE = 16000
+
+# Streamed text is cut for synthesis at sentence ends, or at these lengths
+FIRST_SPEECH_CHUNK_CHARS = 700
+SPEECH_CHUNK_CHARS = 4000
+_SENTENCE_END_RE = re.compile(r'[.!?]\s')
+
 
 class AudioHandler:
     """
@@ -35,11 +84,28 @@ class AudioHandler:
         self.config = config
         self.logger = logger
         self.whisper_model = None
-        self.audio_enabled = WHISPER_AVAILABLE and GTTS_AVAILABLE
+        self.use_fp16 = False
+        self.processor = None
+        self.ort_device = "cpu"
+        self.backend = self._select_backend()
+        self.audio_enabled = self.backend is not None and GTTS_AVAILABLE
         
         if not self.audio_enabled:
             self.logger.warning("Audio libraries not installed. Voice features disabled.")
-            self.logger.warning("To enable: pip install openai-whisper gtts")
+            self.logger.warning("To enable: pip install faster-whisper gtts")
+    
+    def _select_backend(self) -> Optional[str]:
+        """Pick the configured STT backend, falling back to any installed one"""
+        preferred = self.config.audio.backend
+        if STT_BACKENDS.get(preferred):
+            return preferred
+        
+        for backend, available in STT_BACKENDS.items():
+            if available:
+                self.logger.warning("STT backend '%s' not available, using '%s'", preferred, backend)
+                return backend
+        
+        return None
     
     def initialize(self) -> bool:
         """Initialize audio handler"""
@@ -48,32 +114,180 @@ class AudioHandler:
             return True  # Return True so app continues without audio
         
         try:
-            self.logger.info("Loading Whisper model...")
-            self.whisper_model = whisper.load_model(self.config.audio.whisper_model)
-            self.logger.info("Audio Handler: Enabled")
+            self.logger.info("Loading Whisper model...", backend=self.backend)
+            self.whisper_model = self._load_model()
+            self.logger.info("Audio Handler: Enabled", backend=self.backend)
             return True
         except Exception as e:
             self.logger.error("Failed to load Whisper model", exception=e)
             self.audio_enabled = False
             return True  # Still return True to continue without audio
     
-    def transcribe_audio(self, audio_data: bytes, language: Optional[str] = None) -> Tuple[str, str]:
+    def _load_model(self):
+        """Load the Whisper model for the selected backend"""
+        model_name = self.config.audio.whisper_model
+        cache_dir = self.config.paths.model_cache_dir
+        
+        if self.backend == "faster_whisper":
+            # CTranslate2 quantized inference
+            return WhisperModel(
+                model_name,
+                device=self.config.audio.device,
+                compute_type=self.config.audio.compute_type,
+                download_root=str(cache_dir)
+            )
+        
+        if self.backend == "whisper_cpp":
+            return WhisperCppModel(model_name, models_dir=str(cache_dir))
+        
+        if self.backend == "onnx":
+            return self._load_onnx_model(model_name)
+        
+        # openai-whisper only supports fp16 on CUDA
+        import torch
+        self.use_fp16 = torch.cuda.is_available() and self.config.audio.compute_type != "float32"
+        return whisper.load_model(model_name, download_root=str(cache_dir))
+    
+    def _load_onnx_model(self, model_name: str):
+        """
+        Export Whisper to ONNX and load it with ONNX Runtime
+        
+        On CUDA the session uses I/O binding, so encoder hidden states and
+        the decoder KV cache stay on the GPU between decoding steps instead
+        of being copied back to the host. The exported model is kept in the
+        model cache so later starts skip the export.
+        """
+        model_id = f"openai/whisper-{model_name}"
+        export_dir = self.config.paths.model_cache_dir / f"whisper-{model_name}-onnx"
+        # Exports are staged and moved into place when complete, so a
+        # half-written directory from an interrupted run isn't loaded
+        exported = (export_dir / "encoder_model.onnx").exists()
+        
+        device = self.config.audio.device
+        cuda_available = "CUDAExecutionProvider" in ort.get_available_providers()
+        use_cuda = device != "cpu" and cuda_available
+        if device == "cuda" and not cuda_available:
+            self.logger.warning("CUDA requested but ONNX Runtime has no CUDA provider, using CPU")
+        
+        # The exported graph runs in float32; quantized/half exports aren't supported here
+        if self.config.audio.compute_type != "float32":
+            self.logger.info("compute_type has no effect for the ONNX backend (runs float32)",
+                             compute_type=self.config.audio.compute_type)
+        
+        self.ort_device = "cuda" if use_cuda else "cpu"
+        self.processor = WhisperProcessor.from_pretrained(export_dir if exported else model_id)
+        
+        model = ORTModelForSpeechSeq2Seq.from_pretrained(
+            export_dir if exported else model_id,
+            export=not exported,
+            provider="CUDAExecutionProvider" if use_cuda else "CPUExecutionProvider",
+            use_io_binding=use_cuda
+        )
+        
+        if not exported:
+            self._save_onnx_export(model, export_dir)
+        
+        return model
+    
+    def _save_onnx_export(self, model, export_dir: Path):
+        """Save the exported model, replacing export_dir only once it is complete"""
+        staging_dir = Path(tempfile.mkdtemp(prefix=f".{export_dir.name}-", dir=export_dir.parent))
+        try:
+            model.save_pretrained(staging_dir)
+            self.processor.save_pretrained(staging_dir)
+            
+            # Clear an export left half-written by an interrupted earlier run
+            shutil.rmtree(export_dir, ignore_errors=True)
+            staging_dir.rename(export_dir)
+        except Exception as e:
+            # The model is loaded either way; the export is redone next start
+            self.logger.warning("Failed to cache ONNX export", error=str(e))
+            shutil.rmtree(staging_dir, ignore_errors=True)
+    
+    def _run_onnx_transcription(self, audio: "np.ndarray", language: Optional[str]) -> Tuple[str, str]:
+        """Run the ONNX Runtime backend on a decoded 16 kHz array"""
+        features = self.processor(
+            audio, sampling_rate=WHISPER_SAMPLE_RATE, return_tensors="pt"
+        ).input_features.to(self.ort_device)
+        
+        token_ids = self.whisper_model.generate(features, language=language, task="transcribe")
+        text = self.processor.batch_decode(token_ids, skip_special_tokens=True)[0]
+        
+        if language is None:
+            # Second decoder token is the detected language, e.g. <|en|>
+            language = self.processor.tokenizer.convert_ids_to_tokens(int(token_ids[0][1])).strip("<|>")
+        
+        return text.strip(), language
+    
+    def _run_transcription(self, audio, language: Optional[str]) -> Tuple[str, str]:
+        """Run the selected backend on a decoded array or audio file path"""
+        if self.backend == "onnx":
+            return self._run_onnx_transcription(audio, language)
+        
+        if self.backend == "faster_whisper":
+            segments, info = self.whisper_model.transcribe(
+                audio, language=language, beam_size=1, vad_filter=True
+            )
+            text = "".join(seg.text for seg in segments)
+            return text.strip(), info.language
+        
+        if self.backend == "whisper_cpp":
+            # whisper.cpp does not report the detected language
+            segments = self.whisper_model.transcribe(audio, language=language or "auto")
+            text = "".join(seg.text for seg in segments)
+            return text.strip(), language or "unknown"
+        
+        result = self.whisper_model.transcribe(audio, language=language, fp16=self.use_fp16)
+        return result['text'].strip(), result.get('language', 'unknown')
+    
+    def _decode_audio(self, audio_data: Union[bytes, memoryview]) -> Optional["np.ndarray"]:
+        """
+        Decode audio bytes in memory to a 16 kHz mono float32 array
+        
+        Returns None when the input can't be used directly (soundfile missing,
+        compressed format or other sample rate), so the caller can fall back
+        to letting the backend decode it with ffmpeg.
+        """
+        if not SOUNDFILE_AVAILABLE:
+            return None
+        
+        try:
+            data, sample_rate = sf.read(io.BytesIO(audio_data), dtype='float32')
+        except Exception:
+            return None
+        
+        if sample_rate != WHISPER_SAMPLE_RATE:
+            return None
+        
+        if data.ndim > 1:
+            data = data.mean(axis=1)
+        
+        return np.ascontiguousarray(data, dtype=np.float32)
+    
+    def transcribe_audio(self, audio_data: Union[bytes, memoryview],
+                         language: Optional[str] = None) -> Tuple[str, str]:
         """Transcribe audio to text"""
         if not self.audio_enabled or not self.whisper_model:
             self.logger.warning("Audio transcription not available")
             return "", "unknown"
         
         try:
-            import tempfile
+            audio = self._decode_audio(audio_data)
+            if audio is not None:
+                return self._run_transcription(audio, language)
+            
+            if self.backend == "onnx":
+                self.logger.warning("ONNX backend requires 16 kHz WAV audio")
+                return "", "unknown"
             
             with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as f:
                 f.write(audio_data)
                 temp_path = f.name
             
-            result = self.whisper_model.transcribe(temp_path, language=language, fp16=False)
-            Path(temp_path).unlink(missing_ok=True)
-            
-            return result['text'].strip(), result.get('language', 'unknown')
+            try:
+                return self._run_transcription(temp_path, language)
+            finally:
+                Path(temp_path).unlink(missing_ok=True)
             
         except Exception as e:
             self.logger.error("Transcription failed", exception=e)
@@ -96,6 +310,68 @@ class AudioHandler:
             self.logger.error("Speech synthesis failed", exception=e)
             return None
     
+    async def synthesize_stream(self, text_stream: AsyncIterator[str],
+                                language: str = "en") -> AsyncIterator[bytes]:
+        """
+        Convert streamed text to speech, yielding MP3 bytes per chunk
+        
+        Text is cut at sentence ends so the first chunk can be synthesized
+        while the rest of the answer is still being generated. Chunks are
+        synthesized one at a time in a background thread and yielded in order.
+        """
+        if not self.audio_enabled:
+            self.logger.warning("Speech synthesis not available")
+            return
+        
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        pending = deque()
+        buffer = ""
+        limit = FIRST_SPEECH_CHUNK_CHARS
+        
+        try:
+            async for text in text_stream:
+                buffer += text
+                
+                while True:
+                    chunk, buffer = self._split_speech_chunk(buffer, limit)
+                    if not chunk:
+                        break
+                    pending.append(loop.run_in_executor(executor, self.synthesize_speech, chunk, language))
+                    limit = SPEECH_CHUNK_CHARS
+                
+                # Hand over finished chunks without waiting on the rest
+                while pending and pending[0].done():
+                    audio = pending.popleft().result()
+                    if audio:
+                        yield audio
+            
+            if buffer.strip():
+                pending.append(loop.run_in_executor(executor, self.synthesize_speech, buffer.strip(), language))
+            
+            while pending:
+                audio = await pending.popleft()
+                if audio:
+                    yield audio
+        finally:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=False)
+    
+    def _split_speech_chunk(self, buffer: str, limit: int) -> Tuple[str, str]:
+        """Cut a chunk off the front of buffer at a sentence end, or at `limit` characters"""
+        match = _SENTENCE_END_RE.search(buffer, 0, limit)
+        if match:
+            return buffer[:match.end()].strip(), buffer[match.end():]
+        
+        if len(buffer) >= limit:
+            cut = buffer.rfind(" ", 0, limit)
+            if cut <= 0:
+                cut = limit
+            return buffer[:cut].strip(), buffer[cut:]
+        
+        return "", buffer
+    
     def audio_to_base64(self, audio_bytes: bytes) -> str:
         """Convert audio bytes to base64"""
         return base64.b64encode(audio_bytes).decode('utf-8')
@@ -4,12 +4,13 @@ Centralized configuration for the Customer Support Agent
 """
 
 import os
-from dataclasses import dataclass
-from typing import List
+import types
+from dataclasses import dataclass, field, replace
+from typing import Mapping, Tuple
 from pathlib import Path
 
 
-@dataclass
+@dataclass(frozen=True)
 class LLMConfig:
     """LLM Configuration Settings"""
     model_name: str = "llama3.2"
@@ -18,126 +19,109 @@ class LLMConfig:
     context_window: int = 4096
     
 
-@dataclass
+@dataclass(frozen=True)
 class RAGConfig:
     """RAG (Retrieval Augmented Generation) Configuration"""
     chunk_size: int = 800
     chunk_overlap: int = 150
     top_k_results: int = 4
     similarity_threshold: float = 0.7
+    embedding_model: str = "nomic-embed-text"
+    cache_size: int = 1024  # Cached answers for repeated questions
+    semantic_cache_threshold: float = 0.97  # Min cosine similarity for a near-duplicate hit
     
 
-@dataclass
+@dataclass(frozen=True)
 class VectorStoreConfig:
     """Vector Database Configuration"""
     persist_directory: str = "./vectorstore"
     collection_name: str = "support_knowledge_base"
     
 
-@dataclass
+@dataclass(frozen=True)
 class AudioConfig:
     """Audio Processing Configuration"""
     whisper_model: str = "base"  # Options: tiny, base, small, medium, large
+    backend: str = "faster_whisper"  # Options: faster_whisper, whisper_cpp, openai, onnx
+    device: str = "auto"  # Options: auto, cpu, cuda
+    compute_type: str = "int8"  # Options: int8 (CPU), float16 (GPU), float32
     sample_rate: int = 16000
     channels: int = 1
     
 
-@dataclass
+# Event loop implementations the server can run on. There is no io_uring
+# option: no maintained io_uring-backed asyncio loop supports websockets, so
+# the selection point exists for one to be added here later.
+EVENT_LOOPS = ("auto", "uvloop", "asyncio")
+
+
+@dataclass(frozen=True)
 class ServerConfig:
     """WebSocket Server Configuration"""
     host: str = "0.0.0.0"
-    port = int(os.environ.get("PORT", 8000))
+    port: int = int(os.environ.get("PORT", 8000))
     max_connections: int = 100
+    event_loop: str = "auto"  # Options: see EVENT_LOOPS; auto uses uvloop if installed
     
 
-@dataclass
+@dataclass(frozen=True)
 class PathConfig:
     """File Path Configuration"""
     base_dir: Path = Path(__file__).parent
     knowledge_base_dir: Path = base_dir / "knowledge_base"
     logs_dir: Path = base_dir / "logs"
     audio_temp_dir: Path = base_dir / "temp_audio"
+    model_cache_dir: Path = base_dir / "model_cache"
     
     def __post_init__(self):
         """Create directories if they don't exist"""
         self.knowledge_base_dir.mkdir(exist_ok=True)
         self.logs_dir.mkdir(exist_ok=True)
         self.audio_temp_dir.mkdir(exist_ok=True)
+        self.model_cache_dir.mkdir(exist_ok=True)
+
+
+# Language code to name mapping
+_LANGUAGE_NAMES = types.MappingProxyType({
+    "en": "English",
+    "es": "Spanish",
+    "fr": "French",
+    "de": "German",
+    "it": "Italian",
+    "pt": "Portuguese",
+    "hi": "Hindi",
+    "zh": "Chinese",
+    "ja": "Japanese",
+    "ko": "Korean",
+    "ar": "Arabic",
+    "ru": "Russian"
+})
 
 
-@dataclass
+@dataclass(frozen=True)
 class SupportedLanguages:
     """Supported Languages Configuration"""
-    languages: List[str] = None
+    languages: Tuple[str, ...] = (
+        "en", "es", "fr", "de", "it", "pt", 
+        "hi", "zh", "ja", "ko", "ar", "ru"
+    )
     
-    def __post_init__(self):
-        if self.languages is None:
-            self.languages = [
-                "en", "es", "fr", "de", "it", "pt", 
-                "hi", "zh", "ja", "ko", "ar", "ru"
-            ]
-    
-    def get_language_names(self) -> dict:
-        """Return language code to name mapping"""
-        return {
-            "en": "English",
-            "es": "Spanish",
-            "fr": "French",
-            "de": "German",
-            "it": "Italian",
-            "pt": "Portuguese",
-            "hi": "Hindi",
-            "zh": "Chinese",
-            "ja": "Japanese",
-            "ko": "Korean",
-            "ar": "Arabic",
-            "ru": "Russian"
-        }
+    def get_language_names(self) -> Mapping[str, str]:
+        """Return language code to name mapping (read-only)"""
+        return _LANGUAGE_NAMES
 
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    """Main Configuration Class - Singleton Pattern"""
-    
-    _instance = None
-    
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._initialized = False
-        return cls._instance
-    
-    def __init__(self):
-        if self._initialized:
-            return
-            
-        self.llm = LLMConfig()
-        self.rag = RAGConfig()
-        self.vectorstore = VectorStoreConfig()
-        self.audio = AudioConfig()
-        self.server = ServerConfig()
-        self.paths = PathConfig()
-        self.languages = SupportedLanguages()
-        
-        self._initialized = True
-    
-    @classmethod
-    def get_instance(cls) -> 'Config':
-        """Get singleton instance"""
-        return cls()
-    
-    def update_from_env(self):
-        """Update configuration from environment variables"""
-        if os.getenv("LLM_MODEL"):
-            self.llm.model_name = os.getenv("LLM_MODEL")
-        
-        if os.getenv("LLM_TEMPERATURE"):
-            self.llm.temperature = float(os.getenv("LLM_TEMPERATURE"))
-        
-        if os.getenv("SERVER_PORT"):
-            self.server.port = int(os.getenv("SERVER_PORT"))
-        
-        if os.getenv("WHISPER_MODEL"):
-            self.audio.whisper_model = os.getenv("WHISPER_MODEL")
+    """Main Configuration Class - immutable, shared via the module-level `config`"""
+    
+    llm: LLMConfig = field(default_factory=LLMConfig)
+    rag: RAGConfig = field(default_factory=RAGConfig)
+    vectorstore: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    audio: AudioConfig = field(default_factory=AudioConfig)
+    server: ServerConfig = field(default_factory=ServerConfig)
+    paths: PathConfig = field(default_factory=PathConfig)
+    languages: SupportedLanguages = field(default_factory=SupportedLanguages)
     
     def validate(self) -> bool:
         """Validate configuration settings"""
@@ -165,6 +149,34 @@ class Config:
         """
 
 
+def _apply_env(cfg: Config) -> Config:
+    """Return a copy of the configuration with environment variable overrides"""
+    llm = cfg.llm
+    if os.getenv("LLM_MODEL"):
+        llm = replace(llm, model_name=os.getenv("LLM_MODEL"))
+    
+    if os.getenv("LLM_TEMPERATURE"):
+        llm = replace(llm, temperature=float(os.getenv("LLM_TEMPERATURE")))
+    
+    server = cfg.server
+    if os.getenv("SERVER_PORT"):
+        server = replace(server, port=int(os.getenv("SERVER_PORT")))
+    
+    if os.getenv("EVENT_LOOP"):
+        server = replace(server, event_loop=os.getenv("EVENT_LOOP").strip().lower())
+    
+    audio = cfg.audio
+    if os.getenv("WHISPER_MODEL"):
+        audio = replace(audio, whisper_model=os.getenv("WHISPER_MODEL"))
+    
+    if os.getenv("WHISPER_BACKEND"):
+        audio = replace(audio, backend=os.getenv("WHISPER_BACKEND"))
+    
+    if os.getenv("WHISPER_COMPUTE_TYPE"):
+        audio = replace(audio, compute_type=os.getenv("WHISPER_COMPUTE_TYPE"))
+    
+    return replace(cfg, llm=llm, server=server, audio=audio)
+
+
 # Global config instance
-config = Config.get_instance()
-config.update_from_env()
\ No newline at end of file
+config = _apply_env(Config())
\ No newline at end of file
@@ -5,12 +5,31 @@ Centralized logging system with structured output
 
 import logging
 import sys
+import time
+import atexit
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime
 from typing import Optional
 from logging.handlers import RotatingFileHandler
 import json
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Max seconds an interaction record may sit in the write buffer
+INTERACTION_FLUSH_INTERVAL = 1.0
+
+# Max interaction records serialized and written per write() call
+INTERACTION_BATCH_SIZE = 100
+
+# Max interaction records waiting for the writer; more are dropped
+INTERACTION_QUEUE_SIZE = 10000
+
 
 class StructuredLogger:
     """
@@ -50,6 +69,18 @@ class StructuredLogger:
         self._setup_console_handler()
         self._setup_file_handler()
         
+        # Interactions are appended by a background writer thread
+        self._interaction_queue: "queue.Queue[Optional[tuple]]" = queue.Queue(
+            maxsize=INTERACTION_QUEUE_SIZE
+        )
+        self._interaction_thread = threading.Thread(
+            target=self._write_interactions,
+            name="interaction-writer",
+            daemon=True
+        )
+        self._interaction_thread.start()
+        atexit.register(self.close)
+        
         self._initialized = True
     
     def _setup_console_handler(self):
@@ -85,28 +116,39 @@ class StructuredLogger:
         file_handler.setFormatter(file_format)
         self.logger.addHandler(file_handler)
     
-    def debug(self, message: str, **kwargs):
+    def is_enabled_for(self, level: int) -> bool:
+        """Check level before building context for a log call on a hot path"""
+        return self.logger.isEnabledFor(level)
+    
+    def debug(self, message: str, *args, **kwargs):
         """Log debug message"""
-        self.logger.debug(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(self._format_message(message, args, kwargs))
     
-    def info(self, message: str, **kwargs):
+    def info(self, message: str, *args, **kwargs):
         """Log info message"""
-        self.logger.info(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(self._format_message(message, args, kwargs))
     
-    def warning(self, message: str, **kwargs):
+    def warning(self, message: str, *args, **kwargs):
         """Log warning message"""
-        self.logger.warning(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(self._format_message(message, args, kwargs))
     
-    def error(self, message: str, exception: Optional[Exception] = None, **kwargs):
+    def error(self, message: str, *args, exception: Optional[Exception] = None, **kwargs):
         """Log error message"""
-        msg = self._format_message(message, **kwargs)
+        if not self.logger.isEnabledFor(logging.ERROR):
+            return
+        msg = self._format_message(message, args, kwargs)
         if exception:
             msg += f" | Exception: {type(exception).__name__}: {str(exception)}"
         self.logger.error(msg, exc_info=exception is not None)
     
-    def critical(self, message: str, exception: Optional[Exception] = None, **kwargs):
+    def critical(self, message: str, *args, exception: Optional[Exception] = None, **kwargs):
         """Log critical message"""
-        msg = self._format_message(message, **kwargs)
+        if not self.logger.isEnabledFor(logging.CRITICAL):
+            return
+        msg = self._format_message(message, args, kwargs)
         if exception:
             msg += f" | Exception: {type(exception).__name__}: {str(exception)}"
         self.logger.critical(msg, exc_info=exception is not None)
@@ -117,9 +159,31 @@ class StructuredLogger:
                             bot_response: str,
                             language: str = "en",
                             processing_time: float = 0.0):
-        """Log user interaction for analytics"""
+        """
+        Log user interaction for analytics
+        
+        Only the raw fields are queued here; the writer thread builds,
+        serializes and writes the records in batches.
+        """
+        try:
+            self._interaction_queue.put_nowait(
+                (time.time(), session_id, language, user_message, bot_response, processing_time)
+            )
+        except queue.Full:
+            self.warning("Interaction log queue full, dropping record", session_id=session_id)
+        
+        if self.logger.isEnabledFor(logging.INFO):
+            self.info("User interaction logged",
+                     session_id=session_id,
+                     language=language,
+                     processing_time=f"{processing_time*1000:.2f}ms")
+    
+    @staticmethod
+    def _encode_interaction(record: tuple) -> bytes:
+        """Serialize a queued interaction as one jsonl line"""
+        timestamp, session_id, language, user_message, bot_response, processing_time = record
         interaction = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": datetime.fromtimestamp(timestamp).isoformat(),
             "session_id": session_id,
             "language": language,
             "user_message": user_message[:200],  # Truncate for privacy
@@ -127,18 +191,92 @@ class StructuredLogger:
             "processing_time_ms": round(processing_time * 1000, 2)
         }
         
-        # Log to separate interactions file
-        interactions_file = self.log_dir / f"interactions_{datetime.now().strftime('%Y%m%d')}.jsonl"
-        with open(interactions_file, 'a', encoding='utf-8') as f:
-            f.write(json.dumps(interaction) + '\n')
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(interaction, option=orjson.OPT_APPEND_NEWLINE)
+        return (json.dumps(interaction) + '\n').encode('utf-8')
+    
+    def _write_interactions(self):
+        """Writer thread: append queued interactions to the daily jsonl file"""
+        current_date = None
+        file = None
+        last_flush = time.monotonic()
+        running = True
         
-        self.info(f"User interaction logged", 
-                 session_id=session_id, 
-                 language=language,
-                 processing_time=f"{processing_time*1000:.2f}ms")
+        try:
+            while running:
+                try:
+                    batch = [self._interaction_queue.get(timeout=INTERACTION_FLUSH_INTERVAL)]
+                except queue.Empty:
+                    batch = []
+                
+                # Take whatever else is already waiting, up to a full batch
+                while batch and len(batch) < INTERACTION_BATCH_SIZE:
+                    try:
+                        batch.append(self._interaction_queue.get_nowait())
+                    except queue.Empty:
+                        break
+                
+                if None in batch:
+                    running = False
+                    batch = batch[:batch.index(None)]
+                
+                # Encode record by record so one bad record is skipped, not fatal
+                lines = []
+                for record in batch:
+                    try:
+                        lines.append(self._encode_interaction(record))
+                    except Exception as e:
+                        self.error("Skipping unserializable interaction", exception=e)
+                
+                try:
+                    if lines:
+                        # Switch to a new file when the date changes
+                        today = datetime.now().strftime('%Y%m%d')
+                        if today != current_date:
+                            if file:
+                                file.close()
+                                file = None
+                            file = open(self.log_dir / f"interactions_{today}.jsonl", 'ab')
+                            current_date = today
+                        file.write(b"".join(lines))
+                    
+                    if file and time.monotonic() - last_flush >= INTERACTION_FLUSH_INTERVAL:
+                        file.flush()
+                        last_flush = time.monotonic()
+                except Exception as e:
+                    # Keep the writer alive; the next batch reopens the file
+                    self.error("Failed to write interactions",
+                              dropped=len(lines),
+                              exception=e)
+                    if file:
+                        try:
+                            file.close()
+                        except OSError:
+                            pass
+                    file = None
+                    current_date = None
+        finally:
+            if file:
+                file.close()
     
-    def _format_message(self, message: str, **kwargs) -> str:
-        """Format message with additional context"""
+    def close(self):
+        """Flush pending interactions and stop the writer thread"""
+        if self._interaction_thread.is_alive():
+            try:
+                self._interaction_queue.put(None, timeout=5)
+            except queue.Full:
+                return
+            self._interaction_thread.join(timeout=5)
+    
+    def _format_message(self, message: str, args: tuple = (), kwargs: Optional[dict] = None) -> str:
+        """
+        Format message with additional context
+        
+        Only called once the level is known to be enabled, so %-style args
+        and context are never formatted for filtered records.
+        """
+        if args:
+            message = message % args
         if kwargs:
             context = " | ".join([f"{k}={v}" for k, v in kwargs.items()])
             return f"{message} | {context}"
@@ -165,13 +303,29 @@ class CustomFormatter(logging.Formatter):
         'RESET': '\033[0m'       # Reset
     }
     
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # Colored levelnames, padded inside the color codes so columns line up
+        reset = self.COLORS['RESET']
+        self._colored = {
+            level: f"{color}{level:<8}{reset}"
+            for level, color in self.COLORS.items()
+            if level != 'RESET'
+        }
+    
     def format(self, record):
-        # Add color to levelname
-        levelname = record.levelname
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
+        colored = self._colored.get(record.levelname)
+        if colored is None:
+            return super().format(record)
         
-        return super().format(record)
+        # Restore the plain levelname so the file handler doesn't get color codes
+        levelname = record.levelname
+        record.levelname = colored
+        try:
+            return super().format(record)
+        finally:
+            record.levelname = levelname
 
 
 # Global logger instance
@@ -7,7 +7,13 @@ import asyncio
 import sys
 from pathlib import Path
 
-from config import config
+try:
+    import uvloop
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
+from config import EVENT_LOOPS, config
 from logger import logger
 from rag_engine_simple import SimpleRAGEngine  
 from audio_handler import AudioHandler
@@ -110,9 +116,9 @@ A: We apologize for any defects! Contact us within 30 days and we'll:
             
             # Ingest documents
             if kb_files:
-                self.logger.info(f"Loading {len(kb_files)} knowledge base files...")
+                self.logger.info("Loading %d knowledge base files...", len(kb_files))
                 stats = self.rag.ingest_documents([str(f) for f in kb_files])
-                self.logger.info(f"✅ Loaded {stats['successful']} files, {stats['total_chunks']} chunks")
+                self.logger.info("✅ Loaded %d files, %d chunks", stats['successful'], stats['total_chunks'])
             
             # Initialize audio (optional, can fail gracefully)
             self.audio = AudioHandler()
@@ -167,11 +173,31 @@ Press Ctrl+C to stop...
             sys.exit(1)
 
 
+def _run(coro):
+    """Run coroutine on the event loop selected by config.server.event_loop"""
+    loop = config.server.event_loop
+    if loop not in EVENT_LOOPS:
+        logger.warning("Unknown event loop %r (options: %s), using asyncio",
+                       loop, ", ".join(EVENT_LOOPS))
+    elif loop == "uvloop" and not UVLOOP_AVAILABLE:
+        logger.warning("uvloop requested but not installed, using asyncio")
+    
+    if loop in ("auto", "uvloop") and UVLOOP_AVAILABLE:
+        logger.info("Using uvloop event loop")
+        if hasattr(uvloop, "run"):
+            return uvloop.run(coro)
+        uvloop.install()  # uvloop < 0.18 has no run()
+        return asyncio.run(coro)
+    
+    logger.info("Using asyncio event loop")
+    return asyncio.run(coro)
+
+
 def main():
     """Entry point"""
     try:
         app = CustomerSupportAgent()
-        asyncio.run(app.run())
+        _run(app.run())
     except Exception as e:
         logger.error("Application failed", exception=e)
         sys.exit(1)
@@ -0,0 +1,118 @@
+"""
+Message Schemas Module
+Fixed-shape messages sent by the WebSocket server
+"""
+
+import json
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+if MSGSPEC_AVAILABLE:
+    # Structs get their field encoders built once at class definition;
+    # the tag is written as the "type" key.
+
+    class Source(msgspec.Struct):
+        """Knowledge base excerpt backing an answer"""
+        source: str
+        excerpt: str
+
+    class Welcome(msgspec.Struct, tag="system", tag_field="type"):
+        """Greeting sent on connect"""
+        message: str
+        supported_languages: List[str]
+        session_id: str
+        timestamp: str
+
+    class TextDelta(msgspec.Struct, tag="text_delta", tag_field="type"):
+        """Answer fragment as it is generated"""
+        content: str
+
+    class TextResponse(msgspec.Struct, tag="text", tag_field="type"):
+        """Complete answer"""
+        content: str
+        sources: List[Source]
+        timestamp: str
+        processing_time_ms: float
+        typing_done: bool = False
+
+    class Transcription(msgspec.Struct, tag="transcription", tag_field="type"):
+        """Text recognized from an audio query"""
+        content: str
+        detected_language: str
+
+    class AudioChunk(msgspec.Struct, tag="audio", tag_field="type"):
+        """Synthesized speech for part of an answer"""
+        audio_data: str
+        format: str
+        sequence: int
+
+    encode_message = msgspec.json.Encoder().encode
+
+else:
+    @dataclass(slots=True)
+    class Source:
+        """Knowledge base excerpt backing an answer"""
+        source: str
+        excerpt: str
+
+    @dataclass(slots=True)
+    class Welcome:
+        """Greeting sent on connect"""
+        type: str = field(default="system", init=False)
+        message: str
+        supported_languages: List[str]
+        session_id: str
+        timestamp: str
+
+    @dataclass(slots=True)
+    class TextDelta:
+        """Answer fragment as it is generated"""
+        type: str = field(default="text_delta", init=False)
+        content: str
+
+    @dataclass(slots=True)
+    class TextResponse:
+        """Complete answer"""
+        type: str = field(default="text", init=False)
+        content: str
+        sources: List[Source]
+        timestamp: str
+        processing_time_ms: float
+        typing_done: bool = False
+
+    @dataclass(slots=True)
+    class Transcription:
+        """Text recognized from an audio query"""
+        type: str = field(default="transcription", init=False)
+        content: str
+        detected_language: str
+
+    @dataclass(slots=True)
+    class AudioChunk:
+        """Synthesized speech for part of an answer"""
+        type: str = field(default="audio", init=False)
+        audio_data: str
+        format: str
+        sequence: int
+
+    if ORJSON_AVAILABLE:
+        def encode_message(message) -> bytes:
+            """Serialize a message to UTF-8 JSON bytes"""
+            return orjson.dumps(message)  # Serializes dataclasses natively
+    else:
+        def encode_message(message) -> bytes:
+            """Serialize a message to UTF-8 JSON bytes"""
+            return json.dumps(asdict(message)).encode('utf-8')
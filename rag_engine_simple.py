@@ -3,8 +3,15 @@ Simple RAG Engine - In-Memory (No ChromaDB needed)
 Works with Python 3.14
 """
 
-from typing import List, Dict, Tuple
+from typing import List, Dict, Tuple, Optional, AsyncIterator
 from pathlib import Path
+import asyncio
+from collections import Counter, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import math
+import os
+import pickle
 import re
 
 try:
@@ -13,9 +20,69 @@ try:
 except ImportError:
     OLLAMA_AVAILABLE = False
 
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
 from config import config
 from logger import logger
 
+# BM25 ranking parameters
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Chunks sent to the embedding model per request
+EMBED_BATCH_SIZE = 32
+
+# Bump when the persisted chunk/index format changes
+_INGEST_CACHE_VERSION = 2
+
+# Cache file name prefix; only files with it are ever removed from the persist dir
+_INGEST_CACHE_PREFIX = "ingest-"
+
+# Keyword search tokenization (shared by indexing and queries)
+_TOKEN_RE = re.compile(r"\w+")
+_STOP_WORDS = frozenset({"the", "a", "an", "is", "are", "of", "to", "and", "or"})
+
+# Paragraph separator used when chunking documents
+_PARA_RE = re.compile(r'\n\n+')
+
+# Prompt for answers grounded in knowledge base context (context goes between head and tail)
+_CONTEXT_PROMPT_HEAD = """You are a helpful customer support agent. Use the following context to answer the question.
+
+Context from knowledge base:
+"""
+_CONTEXT_PROMPT_TAIL = """
+
+Customer Question: {question}
+
+Instructions:
+- Be polite and professional
+- Answer based on the context provided
+- If you don't know, say "I don't have that information in my knowledge base"
+- Keep answers clear and concise
+
+Your Response:"""
+
+# Prompt for answering without knowledge base context
+_DIRECT_PROMPT = """You are a helpful customer support agent. Answer this question professionally:
+
+Question: {question}
+
+Answer:"""
+
+
+def _tokenize(text: str) -> List[str]:
+    """Split text into case-folded search terms, dropping stop words"""
+    return [term for term in _TOKEN_RE.findall(text.casefold()) if term not in _STOP_WORDS]
+
+
+async def _single(text: str) -> AsyncIterator[str]:
+    """Wrap an already complete answer as a one-item stream"""
+    yield text
+
 
 class Document:
     """Simple document class"""
@@ -36,6 +103,26 @@ class SimpleRAGEngine:
         self.documents = []  # Store documents in memory
         self.chunks = []     # Store chunks with metadata
         
+        # Inverted index: term -> [(chunk_id, term_frequency), ...]
+        self.index: Dict[str, List[Tuple[int, int]]] = {}
+        self.chunk_len: List[int] = []  # Terms per chunk
+        self.total_len = 0
+        
+        # L2-normalized chunk embeddings, one row per chunk (None = keyword search only)
+        self.embeddings = None
+        
+        # LRU answer cache: (language, question hash) -> (answer, source_docs)
+        self._cache: "OrderedDict[Tuple[str, bytes], Tuple[str, List[Document]]]" = OrderedDict()
+        
+        # Ring buffer of cached question embeddings for near-duplicate lookups
+        self._cache_vectors = None
+        self._cache_vector_keys: List[Optional[Tuple[str, bytes]]] = []
+        self._cache_next = 0
+        
+        # Non-blocking Ollama client; the semaphore bounds concurrent LLM/embedding calls
+        self._async_client = ollama.AsyncClient() if OLLAMA_AVAILABLE else None
+        self._ollama_slots = asyncio.Semaphore(max(1, self.config.server.max_connections // 4))
+        
         self.logger.info("Simple RAG Engine initialized (in-memory)")
     
     def initialize(self) -> bool:
@@ -52,7 +139,7 @@ class SimpleRAGEngine:
                 ollama.list()
                 self.logger.info("Ollama connection successful")
             except Exception as e:
-                self.logger.error(f"Ollama not running. Start it with: ollama serve", exception=e)
+                self.logger.error("Ollama not running. Start it with: ollama serve", exception=e)
                 return False
             
             self.logger.info("Simple RAG Engine ready")
@@ -63,18 +150,31 @@ class SimpleRAGEngine:
             return False
     
     def ingest_documents(self, file_paths: List[str]) -> Dict:
-        """Load documents into memory"""
+        """Load documents into memory, reusing the on-disk cache if the files are unchanged"""
         stats = {"successful": 0, "failed": 0, "total_chunks": 0}
+        first_new_chunk = len(self.chunks)
+        
+        # A fresh engine can restore an earlier ingestion of the same files
+        cache_key = self._ingest_cache_key(file_paths) if not self.chunks else None
+        if cache_key and self._load_ingest_cache(cache_key):
+            stats["successful"] = len(file_paths)
+            stats["total_chunks"] = len(self.chunks)
+            self._clear_cache()
+            
+            self.logger.info("Loaded knowledge base from cache",
+                            total_chunks=stats["total_chunks"])
+            return stats
+        
+        # Read and split files in parallel, then index them in order
+        with ThreadPoolExecutor(max_workers=max(1, min(len(file_paths), os.cpu_count() or 1))) as pool:
+            futures = [pool.submit(self._load_file, path) for path in file_paths]
         
-        for path in file_paths:
+        for path, future in zip(file_paths, futures):
             try:
-                with open(path, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Split into chunks
-                chunks = self._split_text(content)
+                chunks = future.result()
                 
                 for chunk in chunks:
+                    self._index_chunk(len(self.chunks), chunk)
                     self.chunks.append({
                         'content': chunk,
                         'source': Path(path).name,
@@ -84,11 +184,17 @@ class SimpleRAGEngine:
                 stats["successful"] += 1
                 stats["total_chunks"] += len(chunks)
                 
-                self.logger.info(f"Loaded {Path(path).name}", chunks=len(chunks))
+                self.logger.info("Loaded %s", Path(path).name, chunks=len(chunks))
                 
             except Exception as e:
                 stats["failed"] += 1
-                self.logger.error(f"Failed to load {path}", exception=e)
+                self.logger.error("Failed to load %s", path, exception=e)
+        
+        self._embed_chunks(first_new_chunk)
+        self._clear_cache()  # Knowledge base changed, cached answers may be stale
+        
+        if cache_key and not stats["failed"]:
+            self._save_ingest_cache(cache_key)
         
         self.logger.info("Document ingestion complete", 
                         successful=stats["successful"],
@@ -96,91 +202,341 @@ class SimpleRAGEngine:
         
         return stats
     
+    def _load_file(self, path: str) -> List[str]:
+        """Read a file and split it into chunks"""
+        content = Path(path).read_text(encoding='utf-8')
+        return self._split_text(content,
+                                chunk_size=self.config.rag.chunk_size,
+                                overlap=self.config.rag.chunk_overlap)
+    
+    def _ingest_cache_key(self, file_paths: List[str]) -> Optional[str]:
+        """Hash of the files' paths and contents plus the chunking/embedding settings"""
+        rag = self.config.rag
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr((_INGEST_CACHE_VERSION, rag.chunk_size, rag.chunk_overlap,
+                            rag.embedding_model)).encode('utf-8'))
+        
+        try:
+            for path in file_paths:
+                digest.update(str(path).encode('utf-8') + b"\0")
+                digest.update(Path(path).read_bytes() + b"\0")
+        except OSError:
+            return None  # Let normal ingestion report the unreadable file
+        
+        return digest.hexdigest()
+    
+    def _ingest_cache_files(self, cache_key: str) -> Tuple[Path, Path]:
+        """State and embeddings file paths for cache_key"""
+        persist_dir = Path(self.config.vectorstore.persist_directory)
+        stem = f"{_INGEST_CACHE_PREFIX}{cache_key}"
+        return persist_dir / f"{stem}.pkl", persist_dir / f"{stem}.npy"
+    
+    def _load_ingest_cache(self, cache_key: str) -> bool:
+        """Restore chunks, index and embeddings saved under cache_key"""
+        state_file, embeddings_file = self._ingest_cache_files(cache_key)
+        
+        if not state_file.exists():
+            return False
+        
+        try:
+            with open(state_file, 'rb') as f:
+                state = pickle.load(f)
+            
+            embeddings = None
+            if NUMPY_AVAILABLE and embeddings_file.exists():
+                embeddings = np.load(embeddings_file)
+        except Exception as e:
+            self.logger.warning("Ignoring unreadable knowledge base cache", error=str(e))
+            return False
+        
+        self.chunks = state['chunks']
+        self.index = state['index']
+        self.chunk_len = state['chunk_len']
+        self.total_len = state['total_len']
+        self.embeddings = embeddings
+        
+        # Embeddings may have been unavailable when the cache was written
+        if self.embeddings is None:
+            self._embed_chunks(0)
+            if self.embeddings is not None:
+                try:
+                    np.save(embeddings_file, self.embeddings)
+                except Exception as e:
+                    self.logger.warning("Failed to save knowledge base cache", error=str(e))
+        
+        return True
+    
+    def _save_ingest_cache(self, cache_key: str):
+        """Persist chunks, index and embeddings under cache_key"""
+        state_file, embeddings_file = self._ingest_cache_files(cache_key)
+        persist_dir = state_file.parent
+        
+        try:
+            persist_dir.mkdir(parents=True, exist_ok=True)
+            
+            # Drop caches of earlier versions of the knowledge base
+            for pattern in (f"{_INGEST_CACHE_PREFIX}*.pkl", f"{_INGEST_CACHE_PREFIX}*.npy"):
+                for old_file in persist_dir.glob(pattern):
+                    if old_file not in (state_file, embeddings_file):
+                        old_file.unlink(missing_ok=True)
+            
+            state = {
+                'chunks': self.chunks,
+                'index': self.index,
+                'chunk_len': self.chunk_len,
+                'total_len': self.total_len
+            }
+            with open(state_file, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            
+            if self.embeddings is not None:
+                np.save(embeddings_file, self.embeddings)
+                
+        except Exception as e:
+            self.logger.warning("Failed to save knowledge base cache", error=str(e))
+    
+    def _normalize_rows(self, embeddings: List[List[float]]) -> "np.ndarray":
+        """Stack embeddings into a float32 matrix of unit-length rows"""
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+    
+    def _embed_batch(self, texts: List[str]) -> "np.ndarray":
+        """Get L2-normalized embeddings of several texts, one row per text"""
+        response = ollama.embed(model=self.config.rag.embedding_model, input=texts)
+        return self._normalize_rows(response['embeddings'])
+    
+    def _embed_chunks(self, start: int):
+        """Embed chunks from index `start` onwards"""
+        if not (OLLAMA_AVAILABLE and NUMPY_AVAILABLE) or start >= len(self.chunks):
+            return
+        
+        if start > 0 and self.embeddings is None:
+            return  # Earlier chunks weren't embedded, stay on keyword search
+        
+        try:
+            texts = [chunk['content'] for chunk in self.chunks[start:]]
+            vectors = np.vstack([
+                self._embed_batch(texts[i:i + EMBED_BATCH_SIZE])
+                for i in range(0, len(texts), EMBED_BATCH_SIZE)
+            ])
+        except Exception as e:
+            self.logger.warning("Embedding failed, falling back to keyword search",
+                                model=self.config.rag.embedding_model,
+                                error=str(e))
+            self.embeddings = None
+            return
+        
+        if self.embeddings is None:
+            self.embeddings = vectors
+        else:
+            self.embeddings = np.vstack([self.embeddings, vectors])
+        
+        self.logger.info("Chunk embeddings ready", chunks=len(self.embeddings))
+    
     def _split_text(self, text: str, chunk_size: int = 800, overlap: int = 150) -> List[str]:
-        """Split text into chunks"""
-        # Split by paragraphs first
-        paragraphs = re.split(r'\n\n+', text)
+        """
+        Split text into paragraph-aligned chunks
         
+        Trailing paragraphs of a chunk, up to `overlap` characters, are
+        repeated at the start of the next chunk.
+        """
         chunks = []
-        current_chunk = ""
+        buf: List[str] = []
+        buf_len = 0
         
-        for para in paragraphs:
+        for para in _PARA_RE.split(text):
             para = para.strip()
             if not para:
                 continue
             
-            if len(current_chunk) + len(para) < chunk_size:
-                current_chunk += para + "\n\n"
-            else:
-                if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = para + "\n\n"
+            para_len = len(para) + 2  # Paragraph plus separator
+            
+            if buf and buf_len + len(para) >= chunk_size:
+                chunks.append("\n\n".join(buf))
+                
+                # Carry trailing paragraphs (never the whole chunk) into the next one
+                budget = min(overlap, chunk_size - para_len)
+                carry_start = len(buf)
+                carry_len = 0
+                while carry_start > 1 and carry_len + len(buf[carry_start - 1]) + 2 <= budget:
+                    carry_start -= 1
+                    carry_len += len(buf[carry_start]) + 2
+                
+                buf = buf[carry_start:]
+                buf_len = carry_len
+            
+            buf.append(para)
+            buf_len += para_len
         
-        if current_chunk:
-            chunks.append(current_chunk.strip())
+        if buf:
+            chunks.append("\n\n".join(buf))
         
         return chunks if chunks else [text]
     
+    def _index_chunk(self, chunk_id: int, content: str):
+        """Add a chunk's terms to the inverted index"""
+        term_counts = Counter(_tokenize(content))
+        length = sum(term_counts.values())
+        
+        self.chunk_len.append(length)
+        self.total_len += length
+        
+        for term, tf in term_counts.items():
+            self.index.setdefault(term, []).append((chunk_id, tf))
+    
     def _simple_search(self, query: str, top_k: int = 3) -> List[Dict]:
-        """Simple keyword-based search"""
-        query_words = set(query.lower().split())
+        """BM25 keyword search over the inverted index"""
+        if not self.chunks:
+            return []
         
-        # Score each chunk
-        scored_chunks = []
-        for chunk in self.chunks:
-            content_lower = chunk['content'].lower()
-            
-            # Count matching words
-            score = sum(1 for word in query_words if word in content_lower)
+        num_chunks = len(self.chunks)
+        avg_len = self.total_len / num_chunks or 1
+        
+        # Only chunks that share a term with the query are scored
+        scores = Counter()
+        for term in set(_tokenize(query)):
+            postings = self.index.get(term)
+            if not postings:
+                continue
             
-            if score > 0:
-                scored_chunks.append((score, chunk))
+            idf = math.log(1 + (num_chunks - len(postings) + 0.5) / (len(postings) + 0.5))
+            for chunk_id, tf in postings:
+                norm = tf + BM25_K1 * (1 - BM25_B + BM25_B * self.chunk_len[chunk_id] / avg_len)
+                scores[chunk_id] += idf * tf * (BM25_K1 + 1) / norm
+        
+        return [self.chunks[chunk_id] for chunk_id, _ in scores.most_common(top_k)]
+    
+    def _dense_search(self, query_vec: "np.ndarray", top_k: int = 3) -> List[Dict]:
+        """
+        Cosine-similarity search over the chunk embeddings
         
-        # Sort by score and return top K
-        scored_chunks.sort(reverse=True, key=lambda x: x[0])
-        return [chunk for score, chunk in scored_chunks[:top_k]]
+        Chunks scoring below config.rag.similarity_threshold are dropped;
+        _search then falls back to keyword search.
+        """
+        scores = self.embeddings @ query_vec
+        
+        top_k = min(top_k, len(scores))
+        top = np.argpartition(-scores, top_k - 1)[:top_k]
+        top = top[np.argsort(-scores[top])]
+        top = top[scores[top] >= self.config.rag.similarity_threshold]
+        
+        return [self.chunks[i] for i in top]
     
-    def query(self, question: str, language: str = "en") -> Tuple[str, List[Document]]:
-        """Query the knowledge base"""
+    async def _embed_query(self, question: str) -> Optional["np.ndarray"]:
+        """Embed a question, or None when embedding search is unavailable"""
+        if self.embeddings is None:
+            return None
+        
         try:
-            self.logger.debug(f"Processing query: {question[:50]}...")
+            async with self._ollama_slots:
+                response = await self._async_client.embed(
+                    model=self.config.rag.embedding_model,
+                    input=question
+                )
+            return self._normalize_rows(response['embeddings'])[0]
+        except Exception as e:
+            self.logger.warning("Query embedding failed, using keyword search", error=str(e))
+            return None
+    
+    def _search(self, query: str, query_vec: Optional["np.ndarray"], top_k: int = 3) -> List[Dict]:
+        """Embedding search when available, keyword search otherwise"""
+        if query_vec is not None:
+            results = self._dense_search(query_vec, top_k)
+            if results:
+                return results
+            # Nothing cleared the (uncalibrated) cosine threshold; keyword
+            # matches still give the answer knowledge base context
+        
+        return self._simple_search(query, top_k)
+    
+    def _cache_key(self, question: str, language: str) -> Tuple[str, bytes]:
+        """Cache key for a question, ignoring case and surrounding whitespace"""
+        digest = hashlib.blake2b(question.strip().lower().encode('utf-8'), digest_size=16).digest()
+        return language, digest
+    
+    def _cache_get(self, key: Tuple[str, bytes]) -> Optional[Tuple[str, List[Document]]]:
+        """Look up a cached answer and mark it as recently used"""
+        result = self._cache.get(key)
+        if result is not None:
+            self._cache.move_to_end(key)
+        return result
+    
+    def _semantic_cache_get(self, query_vec: "np.ndarray", language: str) -> Optional[Tuple[str, List[Document]]]:
+        """Look up the cached answer of the most similar earlier question"""
+        if self._cache_vectors is None:
+            return None
+        
+        scores = self._cache_vectors @ query_vec
+        best = int(np.argmax(scores))
+        key = self._cache_vector_keys[best]
+        
+        if key is None or key[0] != language or scores[best] < self.config.rag.semantic_cache_threshold:
+            return None
+        
+        return self._cache_get(key)
+    
+    def _cache_put(self, key: Tuple[str, bytes], result: Tuple[str, List[Document]],
+                   query_vec: Optional["np.ndarray"]):
+        """Store an answer, evicting the least recently used one when full"""
+        cache_size = self.config.rag.cache_size
+        
+        self._cache[key] = result
+        self._cache.move_to_end(key)
+        if len(self._cache) > cache_size:
+            self._cache.popitem(last=False)
+        
+        if query_vec is None:
+            return
+        
+        if self._cache_vectors is None:
+            self._cache_vectors = np.zeros((cache_size, len(query_vec)), dtype=np.float32)
+            self._cache_vector_keys = [None] * cache_size
+        
+        self._cache_vectors[self._cache_next] = query_vec
+        self._cache_vector_keys[self._cache_next] = key
+        self._cache_next = (self._cache_next + 1) % cache_size
+    
+    def _clear_cache(self):
+        """Drop all cached answers"""
+        self._cache.clear()
+        self._cache_vectors = None
+        self._cache_vector_keys = []
+        self._cache_next = 0
+    
+    async def query_stream(self, question: str,
+                           language: str = "en") -> Tuple[AsyncIterator[str], List[Document]]:
+        """
+        Query the knowledge base, streaming the answer as it is generated
+        
+        Returns:
+            Async iterator over answer fragments, and the source documents
+        """
+        try:
+            self.logger.debug("Processing query: %s...", question[:50])
+            
+            cache_key = self._cache_key(question, language)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                self.logger.debug("Answer served from cache")
+                return _single(cached[0]), cached[1]
+            
+            query_vec = await self._embed_query(question)
+            if query_vec is not None:
+                cached = self._semantic_cache_get(query_vec, language)
+                if cached is not None:
+                    self.logger.debug("Answer served from semantic cache")
+                    return _single(cached[0]), cached[1]
             
             # Search for relevant chunks
-            relevant_chunks = self._simple_search(question, top_k=3)
+            relevant_chunks = self._search(question, query_vec, top_k=3)
             
             if not relevant_chunks:
                 return self._get_direct_answer(question), []
             
-            # Build context
+            # Build context and prompt
             context = "\n\n".join([chunk['content'] for chunk in relevant_chunks])
-            
-            # Create prompt
-            prompt = f"""You are a helpful customer support agent. Use the following context to answer the question.
-
-Context from knowledge base:
-{context}
-
-Customer Question: {question}
-
-Instructions:
-- Be polite and professional
-- Answer based on the context provided
-- If you don't know, say "I don't have that information in my knowledge base"
-- Keep answers clear and concise
-
-Your Response:"""
-            
-            # Get response from Ollama
-            response = ollama.generate(
-                model=self.config.llm.model_name,
-                prompt=prompt,
-                options={
-                    'temperature': self.config.llm.temperature,
-                    'num_predict': self.config.llm.max_tokens
-                }
-            )
-            
-            answer = response['response'].strip()
+            prompt = "".join([_CONTEXT_PROMPT_HEAD, context, _CONTEXT_PROMPT_TAIL.format(question=question)])
             
             # Convert to Document objects for compatibility
             source_docs = [
@@ -191,31 +547,102 @@ Your Response:"""
                 for chunk in relevant_chunks
             ]
             
-            self.logger.debug("Query processed successfully")
-            return answer, source_docs
+            # Stream response from Ollama, caching it once complete
+            tokens = self._generate_stream(
+                prompt,
+                options={
+                    'temperature': self.config.llm.temperature,
+                    'num_predict': self.config.llm.max_tokens
+                },
+                fallback=self._get_fallback_response(language),
+                cache_entry=(cache_key, source_docs, query_vec)
+            )
+            return tokens, source_docs
             
         except Exception as e:
             self.logger.error("Query failed", exception=e)
-            return self._get_fallback_response(language), []
+            return _single(self._get_fallback_response(language)), []
     
-    def _get_direct_answer(self, question: str) -> str:
-        """Get answer directly from LLM without context"""
+    async def query(self, question: str, language: str = "en") -> Tuple[str, List[Document]]:
+        """Query the knowledge base and wait for the complete answer"""
+        tokens, source_docs = await self.query_stream(question, language)
+        answer = "".join([token async for token in tokens])
+        return answer.strip(), source_docs
+    
+    async def _generate_stream(self, prompt: str, options: dict, fallback: str,
+                               cache_entry: Optional[tuple] = None) -> AsyncIterator[str]:
+        """
+        Stream answer fragments from Ollama as they are generated
+        
+        Args:
+            prompt: Full LLM prompt
+            options: Ollama generation options
+            fallback: Text to yield if generation fails before any output
+            cache_entry: (cache_key, source_docs, query_vec) to cache the finished answer under
+        """
+        # Ollama is read by a separate task so a slow or vanished consumer
+        # never holds a generation slot; num_predict bounds the queue.
+        fragments: asyncio.Queue = asyncio.Queue()
+        reader = asyncio.create_task(self._read_generation(prompt, options, fragments))
+        
+        parts = []
         try:
-            prompt = f"""You are a helpful customer support agent. Answer this question professionally:
-
-Question: {question}
-
-Answer:"""
-            
-            response = ollama.generate(
-                model=self.config.llm.model_name,
-                prompt=prompt,
-                options={'temperature': 0.7}
-            )
-            
-            return response['response'].strip()
-        except:
-            return "I apologize, but I'm having trouble processing your request right now."
+            while (text := await fragments.get()) is not None:
+                if isinstance(text, Exception):  # Logged by the reader
+                    if not parts:
+                        yield fallback
+                    return
+                
+                if not parts:
+                    text = text.lstrip()
+                if text:
+                    parts.append(text)
+                    yield text
+        finally:
+            reader.cancel()
+        
+        if cache_entry is not None:
+            cache_key, source_docs, query_vec = cache_entry
+            self._cache_put(cache_key, ("".join(parts).strip(), source_docs), query_vec)
+        
+        self.logger.debug("Query processed successfully")
+    
+    async def _read_generation(self, prompt: str, options: dict, fragments: asyncio.Queue):
+        """
+        Read an Ollama generation stream into fragments, ended by None
+        
+        The slot is held only while Ollama is generating; a failure is
+        queued as the exception itself.
+        """
+        try:
+            async with self._ollama_slots:
+                stream = await self._async_client.generate(
+                    model=self.config.llm.model_name,
+                    prompt=prompt,
+                    options=options,
+                    stream=True
+                )
+                
+                async for part in stream:
+                    fragments.put_nowait(part['response'])
+        except Exception as e:
+            self.logger.error("Answer generation failed", exception=e)
+            fragments.put_nowait(e)
+        finally:
+            fragments.put_nowait(None)
+    
+    def _get_direct_answer(self, question: str) -> AsyncIterator[str]:
+        """Stream an answer directly from the LLM without context"""
+        prompt = _DIRECT_PROMPT.format(question=question)
+        
+        return self._generate_stream(
+            prompt,
+            options={
+                'temperature': 0.7,
+                'num_predict': self.config.llm.max_tokens
+            },
+            fallback="I apologize, but I'm having trouble processing your request right now."
+        )
     
     def _get_fallback_response(self, language: str = "en") -> str:
         """Fallback response when query fails"""
@@ -231,5 +658,6 @@ Answer:"""
         return {
             "total_chunks": len(self.chunks),
             "total_documents": len(set(c['source'] for c in self.chunks)),
+            "cached_answers": len(self._cache),
             "model": self.config.llm.model_name
         }
\ No newline at end of file
@@ -4,21 +4,79 @@ Handles real-time bidirectional communication with clients
 """
 
 import asyncio
+import contextlib
 import json
-import uuid
-from typing import Dict, Set, Optional
-from datetime import datetime
+import logging
+import secrets
+import struct
+from typing import Awaitable, Callable, Dict, List, Set, Optional, Union
+from datetime import datetime, timezone
 import time
+from dataclasses import dataclass
+from itertools import islice
 
 import websockets
 from websockets.server import WebSocketServerProtocol
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from config import config
 from logger import logger
+from messages import (
+    AudioChunk, Source, TextDelta, TextResponse, Transcription, Welcome, encode_message
+)
 from rag_engine_simple import SimpleRAGEngine as RAGEngine
 from audio_handler import AudioHandler
 
 
+# How often the cached message timestamp is refreshed (seconds)
+TIMESTAMP_REFRESH_INTERVAL = 0.25
+
+# Answers faster than this are sent without a typing indicator (seconds)
+TYPING_INDICATOR_DELAY = 0.05
+
+# Number of session table shards (power of two, so a mask picks the shard)
+SESSION_SHARDS = 16
+
+# Binary frames: 1-byte frame type + uint32 payload length (little-endian), then payload
+_BINARY_HEADER = struct.Struct("<BI")
+FRAME_AUDIO = 1  # Audio query, text answer
+FRAME_AUDIO_SPOKEN = 2  # Audio query, text and spoken answer
+
+
+def _utc_now_iso() -> str:
+    """Current UTC time as an ISO 8601 string"""
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+if ORJSON_AVAILABLE:
+    def _dumps(message) -> bytes:
+        """Serialize a message (or single JSON value) to UTF-8 JSON bytes"""
+        return orjson.dumps(message)
+    
+    _loads = orjson.loads
+else:
+    def _dumps(message) -> bytes:
+        """Serialize a message (or single JSON value) to UTF-8 JSON bytes"""
+        return json.dumps(message).encode('utf-8')
+    
+    _loads = json.loads
+
+
+@dataclass(slots=True)
+class Session:
+    """State kept for a single WebSocket connection"""
+    websocket: WebSocketServerProtocol
+    language: str = "en"
+    message_count: int = 0
+    connected_at: float = 0.0
+    token: str = ""  # Random client-facing session ID
+
+
 class ConnectionManager:
     """
     Manages WebSocket connections and sessions
@@ -26,11 +84,12 @@ class ConnectionManager:
     
     def __init__(self):
         """Initialize connection manager"""
-        self.active_connections: Dict[str, WebSocketServerProtocol] = {}
-        self.session_metadata: Dict[str, dict] = {}
+        self._shards: List[Dict[int, Session]] = [{} for _ in range(SESSION_SHARDS)]
+        self.session_count = 0
+        self._next_id = 0
         self.logger = logger
     
-    async def connect(self, websocket: WebSocketServerProtocol) -> str:
+    async def connect(self, websocket: WebSocketServerProtocol) -> int:
         """
         Register new connection
         
@@ -40,70 +99,86 @@ class ConnectionManager:
         Returns:
             Session ID
         """
-        session_id = str(uuid.uuid4())
-        self.active_connections[session_id] = websocket
-        self.session_metadata[session_id] = {
-            "connected_at": datetime.now().isoformat(),
-            "language": "en",
-            "message_count": 0
-        }
+        self._next_id += 1
+        session_id = self._next_id
+        token = secrets.token_hex(8)
+        self._shard(session_id)[session_id] = Session(
+            websocket, connected_at=time.time(), token=token
+        )
+        self.session_count += 1
         
         self.logger.info("New connection established",
                         session_id=session_id,
-                        total_connections=len(self.active_connections))
+                        token=token,
+                        total_connections=self.session_count)
         
         return session_id
     
-    async def disconnect(self, session_id: str):
+    async def disconnect(self, session_id: int):
         """
         Remove connection
         
         Args:
             session_id: Session identifier
         """
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-            
-        if session_id in self.session_metadata:
-            metadata = self.session_metadata[session_id]
-            del self.session_metadata[session_id]
-            
+        session = self._shard(session_id).pop(session_id, None)
+        if session is not None:
+            self.session_count -= 1
             self.logger.info("Connection closed",
                            session_id=session_id,
-                           message_count=metadata.get("message_count", 0),
-                           total_connections=len(self.active_connections))
+                           message_count=session.message_count,
+                           total_connections=self.session_count)
     
-    async def send_message(self, session_id: str, message: dict):
+    async def send_message(self, session_id: int, message: Union[dict, bytes]):
         """
         Send message to specific session
         
         Args:
             session_id: Target session
-            message: Message dictionary
+            message: Message dictionary, or already JSON-encoded bytes
         """
-        if session_id in self.active_connections:
-            try:
-                await self.active_connections[session_id].send(
-                    json.dumps(message)
-                )
-            except Exception as e:
-                self.logger.error("Failed to send message",
-                                session_id=session_id,
-                                exception=e)
+        session = self.get_session(session_id)
+        if session is None:
+            return
+        
+        if not isinstance(message, (bytes, bytearray)):
+            message = _dumps(message)
+        
+        try:
+            await session.websocket.send(message)
+        except Exception as e:
+            self.logger.error("Failed to send message",
+                            session_id=session_id,
+                            exception=e)
     
-    def get_session_language(self, session_id: str) -> str:
-        """Get session language"""
-        return self.session_metadata.get(session_id, {}).get("language", "en")
+    def _shard(self, session_id: int) -> Dict[int, Session]:
+        """Session table shard holding session_id"""
+        return self._shards[session_id & (SESSION_SHARDS - 1)]
     
-    def set_session_language(self, session_id: str, language: str):
-        """Set session language"""
-        if session_id in self.session_metadata:
-            self.session_metadata[session_id]["language"] = language
+    def get_session(self, session_id: int) -> Optional[Session]:
+        """Look up a connected session"""
+        return self._shard(session_id).get(session_id)
     
-    def increment_message_count(self, session_id: str):
-        """Increment message counter for session"""
-        if session_id in self.session_metadata:
-            self.session_metadata[session_id]["message_count"] += 1
+    def broadcast(self, message: Union[dict, bytes]):
+        """
+        Send message to every connected session
+        
+        Serializes once and writes the same bytes to all sockets without a
+        coroutine per client; connections that can't keep up are skipped.
+        
+        Args:
+            message: Message dictionary, or already JSON-encoded bytes
+        """
+        if not self.session_count:
+            return
+        
+        if not isinstance(message, (bytes, bytearray)):
+            message = _dumps(message)
+        
+        websockets.broadcast(
+            [session.websocket for shard in self._shards for session in shard.values()],
+            message
+        )
 
 
 class SupportAgentServer:
@@ -125,6 +200,23 @@ class SupportAgentServer:
         self.audio_handler = audio_handler
         self.connection_manager = ConnectionManager()
         
+        # Static payloads, built once instead of per message
+        self._welcome_text = "Welcome to Customer Support! How can I help you today?"
+        self._supported_languages = list(self.config.languages.languages)
+        self._typing_on = _dumps({"type": "typing", "is_typing": True})
+        self._typing_off = _dumps({"type": "typing", "is_typing": False})
+        self._error_template = b'{"type":"error","message":%b,"timestamp":%b}'
+        
+        # JSON message type -> handler
+        self._handlers: Dict[str, Callable[[int, Session, dict], Awaitable[None]]] = {
+            "text": self._handle_text_message,
+            "audio": self._handle_audio_message,
+            "language": self._handle_language_change,
+        }
+        
+        # Message timestamp, refreshed by _tick_timestamp while the server runs
+        self._refresh_timestamp()
+        
         self.logger.info("WebSocket Server initialized")
     
     async def handle_connection(self, websocket: WebSocketServerProtocol, path: str):
@@ -136,6 +228,7 @@ class SupportAgentServer:
             path: Connection path
         """
         session_id = await self.connection_manager.connect(websocket)
+        session = self.connection_manager.get_session(session_id)
         
         try:
             # Send welcome message
@@ -143,7 +236,7 @@ class SupportAgentServer:
             
             # Handle messages
             async for raw_message in websocket:
-                await self._process_message(session_id, raw_message)
+                await self._process_message(session_id, session, raw_message)
                 
         except websockets.exceptions.ConnectionClosed:
             self.logger.info("Connection closed normally", session_id=session_id)
@@ -152,44 +245,50 @@ class SupportAgentServer:
         finally:
             await self.connection_manager.disconnect(session_id)
     
-    async def _send_welcome_message(self, session_id: str):
+    async def _send_welcome_message(self, session_id: int):
         """Send welcome message to new connection"""
-        welcome = {
-            "type": "system",
-            "session_id": session_id,
-            "message": "Welcome to Customer Support! How can I help you today?",
-            "timestamp": datetime.now().isoformat(),
-            "supported_languages": list(self.config.languages.languages)
-        }
-        await self.connection_manager.send_message(session_id, welcome)
+        session = self.connection_manager.get_session(session_id)
+        if session is None:
+            return
+        
+        welcome = Welcome(
+            message=self._welcome_text,
+            supported_languages=self._supported_languages,
+            session_id=session.token,  # Not the guessable internal counter
+            timestamp=self._now_iso
+        )
+        await self.connection_manager.send_message(session_id, encode_message(welcome))
     
-    async def _process_message(self, session_id: str, raw_message: str):
+    async def _process_message(self, session_id: int, session: Session, raw_message: Union[str, bytes]):
         """
         Process incoming message
         
         Args:
             session_id: Session ID
-            raw_message: Raw message string
+            session: Connection state
+            raw_message: JSON text frame, or binary frame with a header
         """
+        if isinstance(raw_message, (bytes, bytearray)):
+            await self._handle_binary_frame(session_id, session, raw_message)
+            return
+        
         try:
-            message = json.loads(raw_message)
+            message = _loads(raw_message)
             message_type = message.get("type", "text")
             
-            self.logger.debug("Processing message",
-                            session_id=session_id,
-                            type=message_type)
+            if self.logger.is_enabled_for(logging.DEBUG):
+                self.logger.debug("Processing message",
+                                session_id=session_id,
+                                type=message_type)
             
-            # Route based on message type
-            if message_type == "text":
-                await self._handle_text_message(session_id, message)
-            elif message_type == "audio":
-                await self._handle_audio_message(session_id, message)
-            elif message_type == "language":
-                await self._handle_language_change(session_id, message)
-            else:
+            # Route based on message type (client-supplied, so may not be hashable)
+            handler = self._handlers.get(message_type) if isinstance(message_type, str) else None
+            if handler is None:
                 await self._send_error(session_id, "Unknown message type")
+                return
+            await handler(session_id, session, message)
                 
-        except json.JSONDecodeError:
+        except json.JSONDecodeError:  # Also raised by orjson
             await self._send_error(session_id, "Invalid JSON")
         except Exception as e:
             self.logger.error("Message processing failed",
@@ -197,12 +296,40 @@ class SupportAgentServer:
                             exception=e)
             await self._send_error(session_id, "Internal server error")
     
-    async def _handle_text_message(self, session_id: str, message: dict):
+    async def _handle_binary_frame(self, session_id: int, session: Session, frame: bytes):
+        """
+        Handle binary frame, which carries audio as-is instead of base64 in JSON
+        
+        Args:
+            session_id: Session ID
+            session: Connection state
+            frame: Header (frame type, payload length) followed by payload
+        """
+        if len(frame) < _BINARY_HEADER.size:
+            await self._send_error(session_id, "Malformed binary frame")
+            return
+        
+        frame_type, payload_len = _BINARY_HEADER.unpack_from(frame, 0)
+        # A view rather than a bytes slice; the decoder (BytesIO or temp file)
+        # still makes its own copy of the audio
+        payload = memoryview(frame)[_BINARY_HEADER.size:_BINARY_HEADER.size + payload_len]
+        if len(payload) != payload_len:
+            await self._send_error(session_id, "Malformed binary frame")
+            return
+        
+        if frame_type == FRAME_AUDIO or frame_type == FRAME_AUDIO_SPOKEN:
+            await self._handle_audio(session_id, session, payload,
+                                     want_audio_response=frame_type == FRAME_AUDIO_SPOKEN)
+        else:
+            await self._send_error(session_id, "Unknown binary frame type")
+    
+    async def _handle_text_message(self, session_id: int, session: Session, message: dict):
         """
         Handle text-based query
         
         Args:
             session_id: Session ID
+            session: Connection state
             message: Message dictionary
         """
         start_time = time.time()
@@ -213,70 +340,125 @@ class SupportAgentServer:
             return
         
         # Get session language
-        language = self.connection_manager.get_session_language(session_id)
+        language = session.language
         
-        # Send typing indicator
-        await self._send_typing_indicator(session_id, True)
+        # Show typing indicator only if the answer isn't ready almost immediately
+        typing_sent = asyncio.Event()
+        typing_task = asyncio.create_task(
+            self._send_typing_after_delay(session_id, TYPING_INDICATOR_DELAY, typing_sent)
+        )
+        
+        # Synthesize speech alongside generation if requested
+        speech_queue = None
+        speech_task = None
+        if message.get("want_audio_response", False) and self.audio_handler.is_enabled():
+            speech_queue = asyncio.Queue()
+            speech_task = asyncio.create_task(
+                self._send_audio_response(session_id, speech_queue, language)
+            )
         
-        # Query RAG engine
-        answer, sources = self.rag_engine.query(user_message, language)
+        # Query RAG engine, forwarding the answer as it is generated
+        parts = []
+        try:
+            tokens, sources = await self.rag_engine.query_stream(user_message, language)
+            
+            # Close the stream even if sending fails, releasing its Ollama request
+            async with contextlib.aclosing(tokens) as tokens:
+                async for token in tokens:
+                    if not parts:
+                        typing_task.cancel()  # The streamed answer replaces the indicator
+                    parts.append(token)
+                    if speech_queue is not None:
+                        speech_queue.put_nowait(token)
+                    await self.connection_manager.send_message(
+                        session_id, encode_message(TextDelta(content=token))
+                    )
+        finally:
+            typing_task.cancel()
+            typing_shown = typing_sent.is_set()
+            if speech_queue is not None:
+                speech_queue.put_nowait(None)  # End of answer
         
-        # Stop typing indicator
-        await self._send_typing_indicator(session_id, False)
+        answer = "".join(parts).strip()
         
         # Calculate processing time
         processing_time = time.time() - start_time
         
+        # Source excerpts, limited to 2 sources
+        source_list = []
+        for doc in islice(sources, 2):
+            text = doc.page_content
+            source_list.append(Source(
+                source=doc.metadata.get("source", "Unknown"),
+                excerpt=text if len(text) <= 150 else text[:150] + "..."
+            ))
+        
         # Send response
-        response = {
-            "type": "text",
-            "content": answer,
-            "sources": [
-                {
-                    "source": doc.metadata.get("source", "Unknown"),
-                    "excerpt": doc.page_content[:150] + "..."
-                }
-                for doc in sources[:2]  # Limit to 2 sources
-            ],
-            "timestamp": datetime.now().isoformat(),
-            "processing_time_ms": round(processing_time * 1000, 2)
-        }
+        response = TextResponse(
+            content=answer,
+            sources=source_list,
+            timestamp=self._now_iso,
+            processing_time_ms=round(processing_time * 1000, 2),
+            typing_done=typing_shown  # Replaces a separate typing=false frame
+        )
         
-        await self.connection_manager.send_message(session_id, response)
+        await self.connection_manager.send_message(session_id, encode_message(response))
         
         # Log interaction
         self.logger.log_user_interaction(
-            session_id=session_id,
+            session_id=session.token,  # Unique across restarts, unlike the counter
             user_message=user_message,
             bot_response=answer,
             language=language,
             processing_time=processing_time
         )
         
-        self.connection_manager.increment_message_count(session_id)
+        session.message_count += 1
+        
+        if speech_task is not None:
+            await speech_task
     
-    async def _handle_audio_message(self, session_id: str, message: dict):
+    async def _handle_audio_message(self, session_id: int, session: Session, message: dict):
         """
         Handle audio-based query
         
         Args:
             session_id: Session ID
+            session: Connection state
             message: Message dictionary with audio data
         """
+        audio_base64 = message.get("audio_data", "")
+        if not audio_base64:
+            await self._send_error(session_id, "No audio data")
+            return
+        
+        try:
+            audio_bytes = await asyncio.to_thread(self.audio_handler.base64_to_audio, audio_base64)
+        except ValueError:
+            await self._send_error(session_id, "Invalid audio data")
+            return
+        
+        await self._handle_audio(session_id, session, audio_bytes,
+                                 message.get("want_audio_response", False))
+    
+    async def _handle_audio(self, session_id: int, session: Session,
+                            audio_bytes: Union[bytes, memoryview],
+                            want_audio_response: bool = False):
+        """
+        Transcribe audio and answer it as a text query
+        
+        Args:
+            session_id: Session ID
+            session: Connection state
+            audio_bytes: Encoded audio (e.g. WAV)
+            want_audio_response: Also send the answer as speech
+        """
         try:
-            # Extract audio data
-            audio_base64 = message.get("audio_data", "")
-            if not audio_base64:
-                await self._send_error(session_id, "No audio data")
-                return
-            
-            # Decode audio
-            audio_bytes = self.audio_handler.base64_to_audio(audio_base64)
-            
             # Transcribe
-            language_hint = self.connection_manager.get_session_language(session_id)
-            transcribed_text, detected_language = self.audio_handler.transcribe_audio(
-                audio_bytes, 
+            language_hint = session.language
+            transcribed_text, detected_language = await asyncio.to_thread(
+                self.audio_handler.transcribe_audio,
+                audio_bytes,
                 language_hint if language_hint != "en" else None
             )
             
@@ -285,24 +467,21 @@ class SupportAgentServer:
                 return
             
             # Update session language if detected differently
-            if detected_language != language_hint:
-                self.connection_manager.set_session_language(session_id, detected_language)
+            if (detected_language != language_hint
+                    and detected_language in self.config.languages.languages):
+                session.language = detected_language
             
             # Send transcription
-            await self.connection_manager.send_message(session_id, {
-                "type": "transcription",
-                "content": transcribed_text,
-                "detected_language": detected_language
-            })
+            await self.connection_manager.send_message(session_id, encode_message(Transcription(
+                content=transcribed_text,
+                detected_language=detected_language
+            )))
             
-            # Process as text query
-            await self._handle_text_message(session_id, {
-                "content": transcribed_text
+            # Process as text query, with a spoken answer if requested
+            await self._handle_text_message(session_id, session, {
+                "content": transcribed_text,
+                "want_audio_response": want_audio_response
             })
-            
-            # Generate audio response if requested
-            if message.get("want_audio_response", False):
-                await self._send_audio_response(session_id, detected_language)
                 
         except Exception as e:
             self.logger.error("Audio message handling failed",
@@ -310,24 +489,46 @@ class SupportAgentServer:
                             exception=e)
             await self._send_error(session_id, "Audio processing failed")
     
-    async def _send_audio_response(self, session_id: str, language: str):
-        """Generate and send audio response"""
-        # Get last text response (from cache or storage)
-        # For simplicity, we'll skip this implementation
-        pass
+    async def _send_audio_response(self, session_id: int, text_queue: asyncio.Queue, language: str):
+        """
+        Generate and send audio response
+        
+        Args:
+            session_id: Session ID
+            text_queue: Answer fragments as they are generated, ended by None
+            language: Speech language
+        """
+        async def text_stream():
+            while (text := await text_queue.get()) is not None:
+                yield text
+        
+        try:
+            sequence = 0
+            async for audio in self.audio_handler.synthesize_stream(text_stream(), language):
+                await self.connection_manager.send_message(session_id, encode_message(AudioChunk(
+                    audio_data=self.audio_handler.audio_to_base64(audio),
+                    format="mp3",
+                    sequence=sequence
+                )))
+                sequence += 1
+        except Exception as e:
+            self.logger.error("Audio response failed",
+                            session_id=session_id,
+                            exception=e)
     
-    async def _handle_language_change(self, session_id: str, message: dict):
+    async def _handle_language_change(self, session_id: int, session: Session, message: dict):
         """
         Handle language preference change
         
         Args:
             session_id: Session ID
+            session: Connection state
             message: Message with new language
         """
         new_language = message.get("language", "en")
         
         if new_language in self.config.languages.languages:
-            self.connection_manager.set_session_language(session_id, new_language)
+            session.language = new_language
             
             await self.connection_manager.send_message(session_id, {
                 "type": "system",
@@ -341,20 +542,39 @@ class SupportAgentServer:
         else:
             await self._send_error(session_id, "Unsupported language")
     
-    async def _send_typing_indicator(self, session_id: str, is_typing: bool):
+    async def _send_typing_after_delay(self, session_id: int, delay: float, sent: asyncio.Event):
+        """
+        Send typing indicator once delay has passed, unless cancelled first
+        
+        sent is set before the frame goes out, so a cancel that lands
+        mid-send still counts as shown and the client is told to hide it.
+        """
+        await asyncio.sleep(delay)
+        sent.set()
+        await self._send_typing_indicator(session_id, True)
+    
+    async def _send_typing_indicator(self, session_id: int, is_typing: bool):
         """Send typing indicator"""
-        await self.connection_manager.send_message(session_id, {
-            "type": "typing",
-            "is_typing": is_typing
-        })
+        await self.connection_manager.send_message(
+            session_id, self._typing_on if is_typing else self._typing_off
+        )
     
-    async def _send_error(self, session_id: str, error_message: str):
+    async def _send_error(self, session_id: int, error_message: str):
         """Send error message"""
-        await self.connection_manager.send_message(session_id, {
-            "type": "error",
-            "message": error_message,
-            "timestamp": datetime.now().isoformat()
-        })
+        await self.connection_manager.send_message(
+            session_id, self._error_template % (_dumps(error_message), self._now_iso_json)
+        )
+    
+    def _refresh_timestamp(self):
+        """Update the cached timestamp string and its JSON-encoded form"""
+        self._now_iso = _utc_now_iso()
+        self._now_iso_json = _dumps(self._now_iso)
+    
+    async def _tick_timestamp(self):
+        """Refresh the cached timestamp so messages don't each format the time"""
+        while True:
+            self._refresh_timestamp()
+            await asyncio.sleep(TIMESTAMP_REFRESH_INTERVAL)
     
     async def start(self):
         """Start WebSocket server"""
@@ -362,13 +582,25 @@ class SupportAgentServer:
                         host=self.config.server.host,
                         port=self.config.server.port)
         
-        async with websockets.serve(
-            self.handle_connection,
-            self.config.server.host,
-            self.config.server.port,
-            max_size=10 * 1024 * 1024  # 10MB max message size
-        ):
-            self.logger.info("WebSocket server running",
-                           host=self.config.server.host,
-                           port=self.config.server.port)
-            await asyncio.Future()  # Run forever
\ No newline at end of file
+        ticker = asyncio.create_task(self._tick_timestamp())
+        try:
+            async with websockets.serve(
+                self.handle_connection,
+                self.config.server.host,
+                self.config.server.port,
+                max_size=10 * 1024 * 1024,  # 10MB max message size
+                compression=None  # Short text and already-compressed MP3 gain little from deflate
+            ):
+                self.logger.info("WebSocket server running",
+                               host=self.config.server.host,
+                               port=self.config.server.port)
+                try:
+                    await asyncio.Future()  # Run forever
+                finally:
+                    self.connection_manager.broadcast({
+                        "type": "system",
+                        "message": "The support server is shutting down. Please reconnect shortly.",
+                        "timestamp": self._now_iso
+                    })
+        finally:
+            ticker.cancel()
\ No newline at end of file